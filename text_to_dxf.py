@@ -7,104 +7,216 @@ containing the vector outlines of the text characters, including support for hol
 in characters like 'A', 'B', 'O', etc.
 
 Requirements:
-    pip install fonttools ezdxf
+    pip install fonttools ezdxf numpy
 
 Usage:
     python text_to_dxf.py "Hello World" font.ttf output.dxf
 """
 
 import sys
-import argparse
 import platform
 import os
+import re
+import json
+import functools
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from fontTools.ttLib import TTFont
 from fontTools.pens.basePen import BasePen
-import ezdxf
-from ezdxf.math import Vec2
 import math
-from tqdm import tqdm
-import matplotlib.pyplot as plt
-
-
+from array import array
+import numpy as np
+
+
+# Maximum distance (in mm) between a flattened curve and the true outline at
+# curve_quality 1.0; lower qualities scale it up proportionally.
+BASE_CURVE_TOLERANCE = 0.02
+
+# curve_quality for each --quality choice
+_QUALITY_MAP = {
+    'low': 0.1,
+    'medium': 0.5,
+    'high': 1.0
+}
+
+# Font discovery cache: {font_path: [mtime_ns, size, display_name]} for every scanned font file
+FONT_CACHE_VERSION = 1
+
+# Font name resolution cache: {font_name_lower: [[font_name, font_path], ...]} for every looked-up name,
+# valid while the modification times of the system font directories and their subdirectories are unchanged
+FONT_RESOLVE_CACHE_VERSION = 1
+
+# Most halvings when flattening one curve (at most MAX_SPLITS + 1 segments per curve)
+MAX_SPLITS = 1024
+
+
+# Standard font directories per platform.system(); anything unlisted is treated as Linux/Unix
+_SYSTEM_FONT_DIRS = {
+    'windows': lambda: [
+        os.path.join(os.environ.get('WINDIR', 'C:\\Windows'), 'Fonts'),
+        os.path.join(os.environ.get('LOCALAPPDATA', ''), 'Microsoft', 'Windows', 'Fonts'),
+    ],
+    'darwin': lambda: [  # macOS
+        '/System/Library/Fonts',
+        '/Library/Fonts',
+        os.path.expanduser('~/Library/Fonts'),
+    ],
+    'linux': lambda: [
+        '/usr/share/fonts',
+        '/usr/local/share/fonts',
+        os.path.expanduser('~/.fonts'),
+        os.path.expanduser('~/.local/share/fonts'),
+    ],
+}
+
+
+@functools.lru_cache(maxsize=1)
 def get_system_font_paths():
-    """Get standard font directories for the current operating system."""
+    """Get standard font directories for the current operating system (memoized)."""
     system = platform.system().lower()
-    font_paths = []
-    
-    if system == "windows":
-        # Windows font directories
-        font_paths.extend([
-            os.path.join(os.environ.get('WINDIR', 'C:\\Windows'), 'Fonts'),
-            os.path.join(os.environ.get('LOCALAPPDATA', ''), 'Microsoft', 'Windows', 'Fonts'),
-        ])
-    elif system == "darwin":  # macOS
-        # macOS font directories
-        font_paths.extend([
-            '/System/Library/Fonts',
-            '/Library/Fonts',
-            os.path.expanduser('~/Library/Fonts'),
-        ])
-    else:  # Linux and other Unix-like systems
-        # Linux font directories
-        font_paths.extend([
-            '/usr/share/fonts',
-            '/usr/local/share/fonts',
-            os.path.expanduser('~/.fonts'),
-            os.path.expanduser('~/.local/share/fonts'),
-        ])
+    font_paths = _SYSTEM_FONT_DIRS.get(system, _SYSTEM_FONT_DIRS['linux'])()
     
     # Filter out non-existent directories
-    return [path for path in font_paths if os.path.exists(path)]
+    return tuple(path for path in font_paths if os.path.exists(path))
+
+
+def _get_font_cache_path(filename='fonts.json'):
+    """Get the path of an on-disk font cache file."""
+    cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache')
+    return os.path.join(cache_home, 'text_to_dxf', filename)
+
+
+def _load_font_cache():
+    """Load the font discovery cache, returning an empty cache if it is missing or unreadable."""
+    try:
+        with open(_get_font_cache_path(), 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get('version') != FONT_CACHE_VERSION:
+        return {}
+    return data.get('fonts', {})
+
+
+def _write_cache_file(cache_path, data):
+    """Atomically write a JSON cache file; failing to write it is not an error."""
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass
+
 
+def _save_font_cache(entries):
+    """Write the font discovery cache."""
+    _write_cache_file(_get_font_cache_path(), {'version': FONT_CACHE_VERSION, 'fonts': entries})
 
+
+def _scan_font_files(font_dir, font_extensions):
+    """Yield os.DirEntry objects for the font files below font_dir, in os.walk order."""
+    pending = [font_dir]
+    while pending:
+        try:
+            with os.scandir(pending.pop()) as it:
+                entries = list(it)
+        except OSError:
+            # Skip directories we can't access
+            continue
+
+        subdirs = []
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+                elif os.path.splitext(entry.name)[1].lower() in font_extensions:
+                    yield entry
+            except OSError:
+                continue
+        pending.extend(reversed(subdirs))
+
+
+def _read_font_display_name(font_path):
+    """Read a display name for a font file from its name table, falling back to the filename."""
+    fallback_name = os.path.splitext(os.path.basename(font_path))[0]
+    try:
+        from fontTools.ttLib import TTFont
+
+        # Open lazily so only the name table is decompiled; use the first font of a .ttc collection
+        with TTFont(font_path, lazy=True, fontNumber=0) as font:
+            if 'name' not in font:
+                # Fallback to filename if no name table
+                return fallback_name
+            name_table = font['name']
+
+            # Try to get the font family name (ID 1) and full name (ID 4)
+            family_name = None
+            full_name = None
+            
+            for record in name_table.names:
+                if record.nameID == 1 and record.platformID == 3:  # Family name, Windows platform
+                    try:
+                        family_name = record.toUnicode()
+                    except:
+                        pass
+                elif record.nameID == 4 and record.platformID == 3:  # Full name, Windows platform
+                    try:
+                        full_name = record.toUnicode()
+                    except:
+                        pass
+        
+        # Use full name if available, otherwise family name, otherwise filename
+        return full_name or family_name or fallback_name
+    except Exception:
+        # If we can't read the font, use the filename
+        return fallback_name
+
+
+@functools.lru_cache(maxsize=1)
 def find_all_fonts():
-    """Find all TrueType and OpenType fonts on the system."""
+    """
+    Find all TrueType and OpenType fonts on the system.
+
+    The result is memoized for the lifetime of the process and must not be modified.
+    Font names are cached on disk per file, keyed by modification time and size,
+    so only new or changed fonts have to be opened. Those are read in parallel.
+    """
     fonts = {}  # Dictionary to store font_name: font_path
     font_extensions = {'.ttf', '.otf', '.ttc'}
+    cache = _load_font_cache()
+    updated_cache = {}
     
+    # First collect every font file, reusing cached names where the file is unchanged
+    stale_paths = []
     for font_dir in get_system_font_paths():
-        try:
-            for root, dirs, files in os.walk(font_dir):
-                for file in files:
-                    if any(file.lower().endswith(ext) for ext in font_extensions):
-                        font_path = os.path.join(root, file)
-                        try:
-                            # Try to get the font name from the font file
-                            font = TTFont(font_path)
-                            name_table = font.get('name')
-                            if name_table:
-                                # Try to get the font family name (ID 1) and full name (ID 4)
-                                family_name = None
-                                full_name = None
-                                
-                                for record in name_table.names:
-                                    if record.nameID == 1 and record.platformID == 3:  # Family name, Windows platform
-                                        try:
-                                            family_name = record.toUnicode()
-                                        except:
-                                            pass
-                                    elif record.nameID == 4 and record.platformID == 3:  # Full name, Windows platform
-                                        try:
-                                            full_name = record.toUnicode()
-                                        except:
-                                            pass
-                                
-                                # Use full name if available, otherwise family name, otherwise filename
-                                display_name = full_name or family_name or os.path.splitext(file)[0]
-                                fonts[display_name] = font_path
-                            else:
-                                # Fallback to filename if no name table
-                                fonts[os.path.splitext(file)[0]] = font_path
-                            
-                            font.close()
-                        except Exception:
-                            # If we can't read the font, use the filename
-                            fonts[os.path.splitext(file)[0]] = font_path
-        except (PermissionError, OSError):
-            # Skip directories we can't access
-            continue
+        for entry in _scan_font_files(font_dir, font_extensions):
+            font_path = entry.path
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+
+            cached = cache.get(font_path)
+            if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+                display_name = cached[2]
+            else:
+                display_name = None
+                stale_paths.append(font_path)
+            updated_cache[font_path] = [stat.st_mtime_ns, stat.st_size, display_name]
+
+    # Then read the names of new or changed fonts; this is I/O bound, so threads overlap it
+    if stale_paths:
+        max_workers = min(32, (os.cpu_count() or 1) * 4, len(stale_paths))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for font_path, display_name in zip(stale_paths, executor.map(_read_font_display_name, stale_paths)):
+                updated_cache[font_path][2] = display_name
+
+    for font_path, (_, _, display_name) in updated_cache.items():
+        fonts[display_name] = font_path
     
+    if updated_cache != cache:
+        _save_font_cache(updated_cache)
     return fonts
 
 
@@ -143,17 +255,17 @@ def list_common_fonts(args):
     print("Searching for common fonts...")
     all_fonts = find_all_fonts()
     
+    # A common name matches at the start of a font name or after a space/hyphen
+    common_name_pattern = re.compile(
+        r"(?:^|[ -])(?:" + "|".join(re.escape(common_name.lower()) for common_name in common_font_names) + ")")
+
     found_common_fonts = {}
     for font_display_name, font_path in all_fonts.items():
-        if font_display_name.lower().startswith("noto"): # Exclude Noto fonts
+        font_name_lower = font_display_name.lower()
+        if font_name_lower.startswith("noto"): # Exclude Noto fonts
             continue
-        for common_name in common_font_names:
-            # Check if the font_display_name starts with the common_name or contains it with a space/hyphen
-            if font_display_name.lower().startswith(common_name.lower()) or \
-               f" {common_name.lower()}" in font_display_name.lower() or \
-               f"-{common_name.lower()}" in font_display_name.lower():
-                found_common_fonts[font_display_name] = font_path
-                break # Found a match for this font_display_name, move to next available font
+        if common_name_pattern.search(font_name_lower):
+            found_common_fonts[font_display_name] = font_path
     
     if not found_common_fonts:
         print("No common fonts found on the system.")
@@ -169,195 +281,256 @@ def list_common_fonts(args):
             print()
 
 
+def _flatten_cubic(p0, p1, p2, p3, tol, out):
+    """
+    Append points approximating a cubic Bezier (excluding p0) to out as flat x, y values.
+
+    Uses De Casteljau subdivision with an explicit stack: a piece is emitted as a
+    chord once it deviates from that chord by at most tol, otherwise it is split
+    in half. A cubic lies within 3/4 of its farthest control point's distance
+    from the chord, so flat stretches need few points and tight bends get more.
+    """
+    tol2 = tol * tol
+    append = out.append
+    stack = [(p0[0], p0[1], p1[0], p1[1], p2[0], p2[1], p3[0], p3[1])]
+    splits = 0
+    while stack:
+        x0, y0, x1, y1, x2, y2, x3, y3 = stack.pop()
+        dx = x3 - x0
+        dy = y3 - y0
+        chord2 = dx * dx + dy * dy
+        ux, uy = x1 - x0, y1 - y0
+        vx, vy = x2 - x0, y2 - y0
+        dot1 = ux * dx + uy * dy
+        dot2 = vx * dx + vy * dy
+        if chord2 > 0 and 0 <= dot1 <= chord2 and 0 <= dot2 <= chord2:
+            cross1 = ux * dy - uy * dx
+            cross2 = vx * dy - vy * dx
+            flat = max(cross1 * cross1, cross2 * cross2) * 0.5625 <= tol2 * chord2
+        else:
+            # Degenerate chord, or control points beyond the end points: bound by their distance
+            flat = max(ux * ux + uy * uy, vx * vx + vy * vy, (x3 - x1) ** 2 + (y3 - y1) ** 2) <= tol2
+
+        if flat or splits >= MAX_SPLITS:
+            append(x3)
+            append(y3)
+            continue
+
+        splits += 1
+        x01, y01 = (x0 + x1) * 0.5, (y0 + y1) * 0.5
+        x12, y12 = (x1 + x2) * 0.5, (y1 + y2) * 0.5
+        x23, y23 = (x2 + x3) * 0.5, (y2 + y3) * 0.5
+        xa, ya = (x01 + x12) * 0.5, (y01 + y12) * 0.5
+        xb, yb = (x12 + x23) * 0.5, (y12 + y23) * 0.5
+        xm, ym = (xa + xb) * 0.5, (ya + yb) * 0.5
+        # Push the second half first so the first half is emitted first
+        stack.append((xm, ym, xb, yb, x23, y23, x3, y3))
+        stack.append((x0, y0, x01, y01, xa, ya, xm, ym))
+
+
+def _flatten_quad(p0, p1, p2, tol, out):
+    """
+    Append points approximating a quadratic Bezier (excluding p0) to out as flat x, y values.
+
+    Same subdivision as _flatten_cubic; a quadratic lies within half its control
+    point's distance from the chord.
+    """
+    tol2 = tol * tol
+    append = out.append
+    stack = [(p0[0], p0[1], p1[0], p1[1], p2[0], p2[1])]
+    splits = 0
+    while stack:
+        x0, y0, x1, y1, x2, y2 = stack.pop()
+        dx = x2 - x0
+        dy = y2 - y0
+        chord2 = dx * dx + dy * dy
+        ux, uy = x1 - x0, y1 - y0
+        dot = ux * dx + uy * dy
+        if chord2 > 0 and 0 <= dot <= chord2:
+            cross = ux * dy - uy * dx
+            flat = cross * cross * 0.25 <= tol2 * chord2
+        else:
+            flat = max(ux * ux + uy * uy, (x2 - x1) ** 2 + (y2 - y1) ** 2) <= tol2
+
+        if flat or splits >= MAX_SPLITS:
+            append(x2)
+            append(y2)
+            continue
+
+        splits += 1
+        x01, y01 = (x0 + x1) * 0.5, (y0 + y1) * 0.5
+        x12, y12 = (x1 + x2) * 0.5, (y1 + y2) * 0.5
+        xm, ym = (x01 + x12) * 0.5, (y01 + y12) * 0.5
+        stack.append((xm, ym, x12, y12, x2, y2))
+        stack.append((x0, y0, x01, y01, xm, ym))
+
+
 class DXFPen(BasePen):
-    """A pen that converts font outlines to DXF polylines."""
+    """
+    A pen that converts font outlines to DXF polylines.
+
+    Paths are recorded in font units and only scaled and offset when drawn, so one
+    pen can be drawn to the DXF at every position the glyph occurs. The path being
+    built is a flat array of x, y doubles; finished paths are (N, 2) arrays. Closed
+    paths end with a copy of their first point, so they can be drawn as given; the
+    copy is dropped again when they are written as closed polylines.
+    """
+
+    # DXF attributes shared by every text outline polyline
+    POLYLINE_ATTRIBS = {"layer": "TEXT_OUTLINES"}
     
-    def __init__(self, msp, x_offset=0, y_offset=0, scale=1.0, curve_quality=0.5):
+    def __init__(self, msp, *, scale=1.0, curve_quality=0.5):
         super().__init__(glyphSet=None)
         self.msp = msp  # DXF model space
-        self.x_offset = x_offset
-        self.y_offset = y_offset
         self.scale = scale
-        self.current_path = []
+        self.current_path = array('d')
         self.paths = []  # Store all paths for this glyph
+        self.closed = []  # Whether each path in self.paths is closed
+        self.bounds = None  # Bounding box of the paths in font units, set by get_bounds()
         self.curve_quality = curve_quality
-        
-    def _transform_point(self, pt):
-        """Transform point coordinates."""
-        x, y = pt
-        return (
-            (x * self.scale) + self.x_offset,
-            (y * self.scale) + self.y_offset
-        )
+        # Flattening tolerance in font units
+        self.tolerance = BASE_CURVE_TOLERANCE / curve_quality / scale
     
     def moveTo(self, pt):
         """Start a new path."""
-        if self.current_path:
-            self.paths.append(self.current_path)
-        self.current_path = [self._transform_point(pt)]
+        self.endPath()
+        self.current_path.extend(pt)
     
     def lineTo(self, pt):
         """Add a line to the current path."""
-        self.current_path.append(self._transform_point(pt))
+        self.current_path.extend(pt)
     
     def curveTo(self, *points):
         """Add a cubic Bezier curve to the current path."""
         if not self.current_path:
             return
             
-        start = self.current_path[-1]
-        cp1, cp2, end = [self._transform_point(pt) for pt in points]
-        
-        # Calculate curve length to determine appropriate number of segments
-        # Rough approximation: sum of control polygon lengths
-        dist1 = ((cp1[0] - start[0])**2 + (cp1[1] - start[1])**2)**0.5
-        dist2 = ((cp2[0] - cp1[0])**2 + (cp2[1] - cp1[1])**2)**0.5
-        dist3 = ((end[0] - cp2[0])**2 + (end[1] - cp2[1])**2)**0.5
-        approx_length = dist1 + dist2 + dist3
-        
-        # Adaptive number of steps based on curve length and scale
-        # More segments for longer curves and larger scales
-        min_steps = 8
-        max_steps = 50
-        steps = max(min_steps, min(max_steps, int(approx_length * self.curve_quality)))
+        start = self.current_path[-2:]
+        cp1, cp2, end = points
         
         # Generate cubic Bezier curve points
-        for i in range(1, steps + 1):
-            t = i / steps
-            # Cubic Bezier formula: B(t) = (1-t)³P₀ + 3(1-t)²tP₁ + 3(1-t)t²P₂ + t³P₃
-            t2 = t * t
-            t3 = t2 * t
-            mt = 1 - t
-            mt2 = mt * mt
-            mt3 = mt2 * mt
-            
-            x = mt3 * start[0] + 3 * mt2 * t * cp1[0] + 3 * mt * t2 * cp2[0] + t3 * end[0]
-            y = mt3 * start[1] + 3 * mt2 * t * cp1[1] + 3 * mt * t2 * cp2[1] + t3 * end[1]
-            self.current_path.append((x, y))
+        _flatten_cubic(start, cp1, cp2, end, self.tolerance, self.current_path)
     
     def qCurveTo(self, *points):
         """Add a quadratic Bezier curve to the current path."""
         if not self.current_path:
             return
             
-        start = self.current_path[-1]
+        start = self.current_path[-2:]
         
         # Handle quadratic curves (can have multiple control points)
         current_start = start
         for i in range(0, len(points)):
             if i == len(points) - 1:
                 # Last point is the end point
-                end = self._transform_point(points[i])
+                end = points[i]
                 
                 # If we only have one point total, it's a line
                 if len(points) == 1:
-                    self.current_path.append(end)
+                    self.current_path.extend(end)
                 else:
                     # Use the previous point as control point
                     if i > 0:
-                        cp = self._transform_point(points[i-1])
+                        cp = points[i-1]
                     else:
                         # No control point, draw line
-                        self.current_path.append(end)
+                        self.current_path.extend(end)
                         break
                     
-                    # Calculate curve length for adaptive segmentation
-                    dist1 = ((cp[0] - current_start[0])**2 + (cp[1] - current_start[1])**2)**0.5
-                    dist2 = ((end[0] - cp[0])**2 + (end[1] - cp[1])**2)**0.5
-                    approx_length = dist1 + dist2
-                    
-                    # Adaptive steps
-                    min_steps = 6
-                    max_steps = 30
-                    steps = max(min_steps, min(max_steps, int(approx_length * self.curve_quality)))
-                    
                     # Generate quadratic Bezier curve points
-                    for j in range(1, steps + 1):
-                        t = j / steps
-                        # Quadratic Bezier formula: B(t) = (1-t)²P₀ + 2(1-t)tP₁ + t²P₂
-                        mt = 1 - t
-                        mt2 = mt * mt
-                        t2 = t * t
-                        
-                        x = mt2 * current_start[0] + 2 * mt * t * cp[0] + t2 * end[0]
-                        y = mt2 * current_start[1] + 2 * mt * t * cp[1] + t2 * end[1]
-                        self.current_path.append((x, y))
+                    _flatten_quad(current_start, cp, end, self.tolerance, self.current_path)
                     
                 current_start = end
             else:
                 # Handle multiple control points in TrueType quadratic curves
                 if i < len(points) - 1:
-                    cp1 = self._transform_point(points[i])
+                    cp1 = points[i]
                     
                     # Check if next point exists and is not the last
                     if i + 1 < len(points) - 1:
-                        cp2 = self._transform_point(points[i + 1])
+                        cp2 = points[i + 1]
                         # Calculate implied on-curve point between control points
                         implied_end = ((cp1[0] + cp2[0]) / 2, (cp1[1] + cp2[1]) / 2)
                         
                         # Draw curve to implied point
-                        dist1 = ((cp1[0] - current_start[0])**2 + (cp1[1] - current_start[1])**2)**0.5
-                        dist2 = ((implied_end[0] - cp1[0])**2 + (implied_end[1] - cp1[1])**2)**0.5
-                        approx_length = dist1 + dist2
-                        
-                        min_steps = 4
-                        max_steps = 20
-                        steps = max(min_steps, min(max_steps, int(approx_length * self.curve_quality)))
-                        
-                        for j in range(1, steps + 1):
-                            t = j / steps
-                            mt = 1 - t
-                            mt2 = mt * mt
-                            t2 = t * t
-                            
-                            x = mt2 * current_start[0] + 2 * mt * t * cp1[0] + t2 * implied_end[0]
-                            y = mt2 * current_start[1] + 2 * mt * t * cp1[1] + t2 * implied_end[1]
-                            self.current_path.append((x, y))
+                        _flatten_quad(current_start, cp1, implied_end, self.tolerance, self.current_path)
                         
                         current_start = implied_end
     
     def closePath(self):
         """Close the current path."""
-        if self.current_path and len(self.current_path) > 1:
+        if len(self.current_path) > 2:
             # Close the path by connecting to the first point
-            if self.current_path[0] != self.current_path[-1]:
-                self.current_path.append(self.current_path[0])
+            if self.current_path[:2] != self.current_path[-2:]:
+                self.current_path.extend(self.current_path[:2])
+        self._finish_path(True)
     
     def endPath(self):
         """End the current path and add it to the paths list."""
+        self._finish_path(False)
+
+    def _finish_path(self, closed):
         if self.current_path:
-            self.paths.append(self.current_path)
-            self.current_path = []
+            self.paths.append(np.array(self.current_path).reshape(-1, 2))
+            self.closed.append(closed)
+            self.current_path = array('d')
     
-    def draw_to_dxf(self):
-        """Draw all paths to the DXF model space."""
-        # Make sure to add the last path
-        if self.current_path:
-            self.paths.append(self.current_path)
-        
-        for path in self.paths:
-            if len(path) > 1:
+    def get_bounds(self):
+        """Return the (min_x, min_y, max_x, max_y) of all finished paths in font units, or None if there are none."""
+        if self.bounds is None and self.paths:
+            points = np.concatenate(self.paths)
+            self.bounds = (*points.min(axis=0).tolist(), *points.max(axis=0).tolist())
+        return self.bounds
+
+    def place(self, x_offset=0, y_offset=0):
+        """Return all paths scaled to mm and moved to the given offset, without drawing them."""
+        # Safety check for pens drawn into directly; a no-op for pens from _tessellate_glyph, which are already ended
+        self.endPath()
+
+        offset = np.array([x_offset, y_offset])
+        # Scale and offset every point of a path in a single vectorized operation
+        return [path * self.scale + offset for path in self.paths]
+
+    def draw_to_dxf(self, x_offset=0, y_offset=0, layout=None):
+        """Draw all paths to the DXF model space (or another layout) at the given offset and return the placed paths."""
+        if layout is None:
+            layout = self.msp
+        placed_paths = self.place(x_offset, y_offset)
+        for placed_path, closed in zip(placed_paths, self.closed):
+            # A closed polyline connects back to its first point itself, so leave out the repeated one
+            vertices = placed_path[:-1] if closed else placed_path
+            if len(vertices) > 1:
                 # Create a polyline for each path
-                polyline = self.msp.add_lwpolyline(path, close=False)
-                polyline.dxf.layer = "TEXT_OUTLINES"
+                layout.add_lwpolyline(vertices.tolist(), close=closed, dxfattribs=self.POLYLINE_ATTRIBS)
+        return placed_paths
 
 
-def find_font_by_name(font_name):
-    """Find a font file by name (case-insensitive partial matching)."""
-    fonts = find_all_fonts()
+@functools.lru_cache(maxsize=1)
+def _get_font_name_index():
+    """Map lowercased font names to (font_name, font_path), keeping the first of any case-insensitive duplicates."""
+    index = {}
+    for name, path in find_all_fonts().items():
+        index.setdefault(name.lower(), (name, path))
+    return index
+
+
+@functools.lru_cache(maxsize=128)
+def _match_fonts(font_name):
+    """Return the (font_name, font_path) pairs matching a font name: the exact match, or all partial matches (memoized)."""
+    index = _get_font_name_index()
     font_name_lower = font_name.lower()
     
     # First, try exact match (case-insensitive)
-    for name, path in fonts.items():
-        if name.lower() == font_name_lower:
-            return path
+    exact_match = index.get(font_name_lower)
+    if exact_match:
+        return (exact_match,)
     
     # Then try partial match
-    matches = []
-    for name, path in fonts.items():
-        if font_name_lower in name.lower():
-            matches.append((name, path))
-    
+    return tuple(match for name_lower, match in index.items() if font_name_lower in name_lower)
+
+
+def _select_font_match(font_name, matches):
+    """Return the path of the only match, or report why there is none."""
     if len(matches) == 1:
         return matches[0][1]
     elif len(matches) > 1:
@@ -372,7 +545,67 @@ def find_font_by_name(font_name):
         return None
 
 
+def find_font_by_name(font_name):
+    """Find a font file by name (case-insensitive partial matching)."""
+    return _select_font_match(font_name, _match_fonts(font_name))
+
+
+def _get_font_dir_stamps():
+    """Get the modification times of the system font directories and every directory below them."""
+    stamps = {}
+    pending = list(reversed(get_system_font_paths()))
+    while pending:
+        font_dir = pending.pop()
+        try:
+            stamps[font_dir] = os.stat(font_dir).st_mtime_ns
+            with os.scandir(font_dir) as it:
+                entries = list(it)
+        except OSError:
+            continue
+        # Adding or removing a font only touches the directory it is in, so walk them all like _scan_font_files
+        subdirs = []
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+            except OSError:
+                continue
+        pending.extend(reversed(subdirs))
+    return stamps
+
+
+def resolve_font_cached(font_name):
+    """
+    Find a font file by name like find_font_by_name, caching the result on disk.
+
+    Lookups, including ones that match no font or several fonts, are remembered
+    until any directory below the system font directories changes, so repeat runs
+    skip the font scan.
+    """
+    cache_path = _get_font_cache_path('font_resolve.json')
+    dir_stamps = _get_font_dir_stamps()
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        data = None
+    if not isinstance(data, dict) or data.get('version') != FONT_RESOLVE_CACHE_VERSION or data.get('dirs') != dir_stamps:
+        data = {'version': FONT_RESOLVE_CACHE_VERSION, 'dirs': dir_stamps, 'names': {}}
+
+    font_name_lower = font_name.lower()
+    matches = data['names'].get(font_name_lower)
+    # Directory times are coarse on some filesystems, so also check the cached files still exist
+    if matches is None or not all(os.path.isfile(path) for _, path in matches):
+        matches = _match_fonts(font_name)
+        data['names'][font_name_lower] = [list(match) for match in matches]
+        _write_cache_file(cache_path, data)
+    return _select_font_match(font_name, matches)
+
+
 def _load_font_and_get_scale(font_path, font_size, font_index, verbose=False):
+    # Imported here, like ezdxf below, to keep startup fast for --help and --list-fonts
+    from fontTools.ttLib import TTFont
+
     if verbose:
         print(f"Loading font: {font_path}")
     try:
@@ -399,6 +632,8 @@ def _load_font_and_get_scale(font_path, font_size, font_index, verbose=False):
 
 
 def _setup_dxf_document(verbose=False):
+    import ezdxf
+
     if verbose:
         print("Creating DXF document...")
     try:
@@ -412,7 +647,7 @@ def _setup_dxf_document(verbose=False):
     return doc, msp
 
 
-def _get_font_tables(font, verbose=False):
+def _get_font_tables(font, scale, verbose=False):
     if verbose:
         print("Getting glyph information...")
     try:
@@ -453,99 +688,167 @@ def _get_font_tables(font, verbose=False):
 
         if verbose:
             print(f"Character map obtained, {len(cmap)} characters available")
-    except Exception as e:
-        raise RuntimeError(f"Could not get character map: {e}")
-
-    return glyph_set, cmap
-
 
-def _get_char_advance(font, glyph_name, glyph_set, scale, spacing, font_size, char, verbose=False):
-    x_advance = None
-    # Method 1: Try hmtx table
-    try:
-        if 'hmtx' in font:
-            hmtx_table = font['hmtx']
+        # Symbol fonts map their characters into the Private Use Area (U+F000-U+F0FF);
+        # make those glyphs reachable through the plain 8-bit character codes
+        if 0xF000 <= min(cmap) <= 0xF8FF:
             if verbose:
-                print(f"  hmtx table metrics keys: {list(hmtx_table.metrics.keys())[:10]}") # Print first 10 keys
-            if glyph_name in hmtx_table.metrics:
-                advance_width, _ = hmtx_table.metrics[glyph_name]
-                x_advance = (advance_width * scale) * spacing
-                if verbose:
-                    print(f"  Advanced by {x_advance:.2f} (from hmtx table, width={advance_width})")
+                print("Detected a Symbol font based on character codes in the PUA range.")
+            cmap = dict(cmap)
+            cmap.update({code - 0xF000: name for code, name in cmap.items() if 0xF000 <= code <= 0xF0FF})
     except Exception as e:
-        if verbose:
-            print(f"  Could not get metrics from hmtx table: {e}")
-
-    # Method 2: Try glyph set width
-    if x_advance is None:
-        try:
-            glyph_obj = glyph_set[glyph_name]
-            if hasattr(glyph_obj, 'width') and glyph_obj.width is not None:
-                advance_width = glyph_obj.width
-                x_advance = (advance_width * scale) * spacing
-                if verbose:
-                    print(f"  Advanced by {x_advance:.2f} (from glyph set, width={advance_width})")
-        except Exception as e:
-            if verbose:
-                print(f"  Could not get width from glyph set: {e}")
+        raise RuntimeError(f"Could not get character map: {e}")
 
-    # Method 3: Fallback to a default advance if other methods fail
-    if x_advance is None:
-        # Default to a generic advance based on font_size if no other metric is available
-        x_advance = (font_size * 0.5) * spacing  # A more generic fallback
+    try:
+        # Advance widths per glyph name, already scaled to mm
+        advance_map = {name: advance_width * scale for name, (advance_width, _) in font['hmtx'].metrics.items()} if 'hmtx' in font else {}
         if verbose:
-            print(f"  Advanced by {x_advance:.2f} (generic fallback)")
+            print(f"Advance widths read for {len(advance_map)} glyphs")
+    except Exception as e:
+        raise RuntimeError(f"Could not read horizontal metrics: {e}")
 
-    return x_advance
+    return glyph_set, cmap, advance_map
 
 
-def _get_kerning_adjustment(font, left_glyph, right_glyph, scale, verbose=False):
-    """Get kerning adjustment for a pair of glyphs from the GPOS table."""
+def _iter_pair_pos_subtables(font):
+    """Yield the pair adjustment (GPOS LookupType 2) subtables of each lookup, grouped per lookup."""
     if 'GPOS' not in font:
-        return 0
+        return
 
     gpos_table = font['GPOS'].table
     if not hasattr(gpos_table, 'LookupList') or not gpos_table.LookupList:
-        return 0
+        return
 
     for lookup in gpos_table.LookupList.Lookup:
         if not lookup or not hasattr(lookup, 'SubTable'):
             continue
-        # LookupType 2 is for Pair Adjustment
-        if lookup.LookupType == 2:
-            for subtable in lookup.SubTable:
-                if not subtable or not hasattr(subtable, 'Format'):
-                    continue
-                # Format 1 is for simple pair kerning
-                if subtable.Format == 1:
-                    if not hasattr(subtable, 'Coverage') or not hasattr(subtable.Coverage, 'glyphs'):
-                        continue
-                    
-                    try:
-                        idx = subtable.Coverage.glyphs.index(left_glyph)
-                    except ValueError:
-                        continue  # left_glyph not in coverage for this subtable
-
-                    if not hasattr(subtable, 'PairSet') or idx >= len(subtable.PairSet):
-                        continue
-
-                    pair_set = subtable.PairSet[idx]
-                    if not pair_set or not hasattr(pair_set, 'PairValueRecord'):
-                        continue
-
-                    for record in pair_set.PairValueRecord:
-                        if record.SecondGlyph == right_glyph:
-                            if hasattr(record, 'Value1') and hasattr(record.Value1, 'XAdvance'):
-                                kerning_value = record.Value1.XAdvance
-                                if verbose:
-                                    print(f"  Kerning adjustment for ({left_glyph}, {right_glyph}): {kerning_value * scale:.2f}")
-                                return kerning_value * scale
-                # Format 2 is for class-based kerning
-                elif subtable.Format == 2:
-                    # This is more complex and less common for specific pairs.
-                    # We will ignore it for now to keep the change simple.
-                    pass
-    return 0
+        subtables = []
+        for subtable in lookup.SubTable:
+            # LookupType 9 wraps other lookup types in extension subtables
+            if lookup.LookupType == 9 and getattr(subtable, 'ExtensionLookupType', None) == 2:
+                subtable = subtable.ExtSubTable
+            elif lookup.LookupType != 2:
+                continue
+            if subtable and hasattr(subtable, 'Format'):
+                subtables.append(subtable)
+        if subtables:
+            yield subtables
+
+
+def _x_advance(value_record):
+    """Get the XAdvance of a GPOS ValueRecord, treating missing records and fields as 0."""
+    if not value_record:
+        return 0
+    return getattr(value_record, 'XAdvance', 0) or 0
+
+
+class _KerningTable:
+    """
+    The GPOS pair adjustments of a font, resolved per glyph pair on first use.
+
+    Format 1 subtables are kept as flat {(left_glyph, right_glyph): x_advance} dicts;
+    class-based Format 2 subtables stay as their class definitions and a table of
+    per-class values, so loading a font doesn't expand every class pair. Values are
+    in font units. Within a lookup the first subtable covering a pair wins;
+    adjustments from separate lookups are summed.
+    """
+
+    def __init__(self, lookups):
+        self.lookups = lookups  # Per lookup, a list of compact subtables (see _compact_pair_pos_subtable)
+        self.pairs = {}  # Memo of resolved (left_glyph, right_glyph) -> x_advance
+
+    def get(self, pair, default=0):
+        """Get the summed x advance adjustment of a glyph pair, like dict.get."""
+        x_advance = self.pairs.get(pair)
+        if x_advance is None:
+            x_advance = self.pairs[pair] = sum(self._resolve(subtables, pair) for subtables in self.lookups)
+        return x_advance or default
+
+    @staticmethod
+    def _resolve(subtables, pair):
+        """Get the adjustment of a pair from the first subtable of a lookup that covers it."""
+        for subtable in subtables:
+            if isinstance(subtable, dict):
+                if pair in subtable:
+                    return subtable[pair]
+            else:
+                coverage, class1_defs, class2_defs, class_values = subtable
+                left_glyph, right_glyph = pair
+                # A class-based subtable covering the left glyph claims every right glyph
+                if left_glyph in coverage:
+                    class2 = class2_defs.get(right_glyph)
+                    # Class 0 of ClassDef2 is "every other glyph"; fonts do not kern against it
+                    return 0 if class2 is None else class_values[class1_defs.get(left_glyph, 0)][class2]
+        return 0
+
+
+def _compact_pair_pos_subtable(subtable):
+    """Reduce a pair adjustment subtable to plain Python data, or return None if it can't be used."""
+    if not hasattr(subtable, 'Coverage') or not hasattr(subtable.Coverage, 'glyphs'):
+        return None
+    # Format 1 is for simple pair kerning
+    if subtable.Format == 1:
+        if not hasattr(subtable, 'PairSet'):
+            return None
+        pairs = {}
+        for left_glyph, pair_set in zip(subtable.Coverage.glyphs, subtable.PairSet):
+            if not pair_set or not hasattr(pair_set, 'PairValueRecord'):
+                continue
+            for record in pair_set.PairValueRecord:
+                pairs.setdefault((left_glyph, record.SecondGlyph), _x_advance(getattr(record, 'Value1', None)))
+        return pairs
+    # Format 2 is for class-based kerning, kept as classes and looked up per pair
+    if subtable.Format == 2:
+        class_values = [[_x_advance(getattr(class2_record, 'Value1', None)) for class2_record in class1_record.Class2Record]
+                        for class1_record in subtable.Class1Record]
+        return (frozenset(subtable.Coverage.glyphs),
+                dict(subtable.ClassDef1.classDefs) if subtable.ClassDef1 else {},
+                dict(subtable.ClassDef2.classDefs) if subtable.ClassDef2 else {},
+                class_values)
+    return None
+
+
+def _build_kerning_table(font):
+    """Collect the GPOS pair adjustments of a font into a _KerningTable."""
+    lookups = []
+    for subtables in _iter_pair_pos_subtables(font):
+        compact_subtables = [compact for compact in map(_compact_pair_pos_subtable, subtables) if compact is not None]
+        if compact_subtables:
+            lookups.append(compact_subtables)
+    return _KerningTable(lookups)
+
+
+@functools.lru_cache(maxsize=2)
+def _load_kerning_table(font_path, font_index, mtime_ns, size):
+    """Build the kerning table of a font file, memoized per file version (only its pair memo may change)."""
+    from fontTools.ttLib import TTFont
+
+    with TTFont(font_path, lazy=True, fontNumber=font_index) as font:
+        return _build_kerning_table(font)
+
+
+def _get_kerning_table(font_path, font_index, verbose=False):
+    """Get the kerning table of a font file, building it only once per process."""
+    try:
+        stat = os.stat(font_path)
+        kerning_table = _load_kerning_table(os.path.abspath(font_path), font_index, stat.st_mtime_ns, stat.st_size)
+    except Exception as e:
+        raise RuntimeError(f"Could not read kerning table: {e}")
+    if verbose:
+        print(f"Kerning table built, {sum(map(len, kerning_table.lookups))} pair adjustment subtables")
+    return kerning_table
+
+
+def _get_kerning_adjustment(kerning_table, left_glyph, right_glyph, scale, verbose=False):
+    """Get the scaled kerning adjustment for a pair of glyphs."""
+    kerning_value = kerning_table.get((left_glyph, right_glyph), 0)
+    if verbose and kerning_value:
+        print(f"  Kerning adjustment for ({left_glyph}, {right_glyph}): {kerning_value * scale:.2f}")
+    return kerning_value * scale
+
+
+# DXF attributes shared by every surrounding shape entity
+SURROUND_ATTRIBS = {"layer": "SURROUND"}
 
 
 def add_oval(msp, min_x, min_y, max_x, max_y, offset, verbose=False):
@@ -575,8 +878,7 @@ def add_oval(msp, min_x, min_y, max_x, max_y, offset, verbose=False):
         major_axis = (0, y_radius)
         ratio = x_radius / y_radius
     
-    ellipse_entity = msp.add_ellipse(center, major_axis, ratio)
-    ellipse_entity.dxf.layer = "SURROUND"
+    ellipse_entity = msp.add_ellipse(center, major_axis, ratio, dxfattribs=SURROUND_ATTRIBS)
     if verbose:
         print(f"  add_oval: Added ELLIPSE entity to msp. Layer: {ellipse_entity.dxf.layer}")
 
@@ -612,61 +914,43 @@ def generate_surrounding_shape(msp, min_x, min_y, max_x, max_y, surround, paddin
         if radius == 0:
             # Simple rectangle
             points = [(min_x, min_y), (max_x, min_y), (max_x, max_y), (min_x, max_y), (min_x, min_y)]
-            msp.add_lwpolyline(points, close=True).dxf.layer = "SURROUND"
+            msp.add_lwpolyline(points, close=True, dxfattribs=SURROUND_ATTRIBS)
             return
 
         # Ensure radius is not larger than half the shortest side
         radius = min(radius, (max_x - min_x) / 2, (max_y - min_y) / 2)
         if radius < 0: radius = 0 # Ensure non-negative radius
 
-        path = []
-        
-        # Start at the bottom-left straight line segment start
-        path.append((min_x + radius, min_y))
-
-        # Bottom line segment
-        path.append((max_x - radius, min_y))
-
-        # Bottom-right arc
-        path.extend(arc_points((max_x - radius, min_y + radius), radius, 270, 360))
-
-        # Right line segment
-        path.append((max_x, min_y + radius))
-        path.append((max_x, max_y - radius))
-
-        # Top-right arc
-        path.extend(arc_points((max_x - radius, max_y - radius), radius, 0, 90))
-
-        # Top line segment
-        path.append((max_x - radius, max_y))
-        path.append((min_x + radius, max_y))
-
-        # Top-left arc
-        path.extend(arc_points((min_x + radius, max_y - radius), radius, 90, 180))
-
-        # Left line segment
-        path.append((min_x, max_y - radius))
-        path.append((min_x, min_y + radius))
-
-        # Bottom-left arc
-        path.extend(arc_points((min_x + radius, min_y + radius), radius, 180, 270))
-
-        # Close the path by appending the first point
-        path.append(path[0])
-        msp.add_lwpolyline(path, close=True).dxf.layer = "SURROUND"
+        # Straight segments and corner arcs, counter-clockwise from the bottom-left
+        path = np.vstack([
+            # Bottom line segment
+            [(min_x + radius, min_y), (max_x - radius, min_y)],
+            # Bottom-right arc
+            arc_points((max_x - radius, min_y + radius), radius, 270, 360),
+            # Right line segment
+            [(max_x, min_y + radius), (max_x, max_y - radius)],
+            # Top-right arc
+            arc_points((max_x - radius, max_y - radius), radius, 0, 90),
+            # Top line segment
+            [(max_x - radius, max_y), (min_x + radius, max_y)],
+            # Top-left arc
+            arc_points((min_x + radius, max_y - radius), radius, 90, 180),
+            # Left line segment
+            [(min_x, max_y - radius), (min_x, min_y + radius)],
+            # Bottom-left arc
+            arc_points((min_x + radius, min_y + radius), radius, 180, 270),
+            # Close the path by repeating the first point
+            [(min_x + radius, min_y)],
+        ])
+        msp.add_lwpolyline(path.tolist(), close=True, dxfattribs=SURROUND_ATTRIBS)
 
     def arc_points(center, radius, start_angle, end_angle, segments=16, reverse=False):
-        """Generate points for an arc."""
-        points = []
+        """Generate points for an arc as an (N, 2) array."""
         if reverse:
             start_angle, end_angle = end_angle, start_angle
         
-        for i in range(segments + 1):
-            angle = math.radians(start_angle + (end_angle - start_angle) * i / segments)
-            x = center[0] + radius * math.cos(angle)
-            y = center[1] + radius * math.sin(angle)
-            points.append((x, y))
-        return points
+        angles = np.deg2rad(np.linspace(start_angle, end_angle, segments + 1))
+        return np.column_stack((center[0] + radius * np.cos(angles), center[1] + radius * np.sin(angles)))
 
     if surround == 'rectangle':
         create_rounded_rect(msp, min_x, min_y, max_x, max_y, corner_radius)
@@ -690,23 +974,21 @@ def generate_surrounding_shape(msp, min_x, min_y, max_x, max_y, surround, paddin
     return
 
 
-def _calculate_line_width(font, line_text, glyph_set, cmap, scale, spacing, font_size, kerning, is_symbol_font, verbose=False):
+def _layout_line(line_text, glyph_set, char_to_glyph, advance_map, kerning_table, scale, spacing, font_size, space_advance, kerning, verbose=False):
     """
-    Calculates the total width of a single line of text, considering font metrics, spacing, and kerning.
+    Lay out a single line of text, considering font metrics, spacing, and kerning.
+
+    Returns the (glyph_name, x) position of each glyph, relative to the start of the
+    line, and the total width of the line.
     """
+    positions = []
     current_x = 0
     previous_glyph_name = None
-
-    space_advance = 0
-    try:
-        space_glyph_name = cmap.get(ord(' '))
-        if space_glyph_name and 'hmtx' in font:
-            space_advance, _ = font['hmtx'][space_glyph_name]
-            space_advance *= scale
-        else:
-            space_advance = font_size * 0.4
-    except Exception:
-        space_advance = font_size * 0.4
+    # Bind lookups used for every character to locals
+    add_position = positions.append
+    get_glyph_name = char_to_glyph.get
+    get_advance = advance_map.get
+    default_advance = font_size * 0.5
 
     for char in line_text:
         if char == ' ':
@@ -714,68 +996,100 @@ def _calculate_line_width(font, line_text, glyph_set, cmap, scale, spacing, font
             previous_glyph_name = None
             continue
 
-        char_code = ord(char)
-        if is_symbol_font:
-            if char_code <= 255:
-                char_code += 0xF000
-
-        if char_code not in cmap:
+        glyph_name = get_glyph_name(char)
+        if glyph_name is None:
             previous_glyph_name = None
             continue
 
-        glyph_name = cmap[char_code]
-
         if kerning and previous_glyph_name:
-            adjustment = _get_kerning_adjustment(font, previous_glyph_name, glyph_name, scale, verbose)
+            adjustment = _get_kerning_adjustment(kerning_table, previous_glyph_name, glyph_name, scale, verbose)
             current_x += adjustment
 
-        try:
-            glyph = glyph_set[glyph_name]
-        except KeyError:
+        if glyph_name not in glyph_set:
+            if verbose:
+                print(f"  Warning: Glyph '{glyph_name}' not found in font, skipping")
             previous_glyph_name = None
             continue
 
-        x_advance = _get_char_advance(font, glyph_name, glyph_set, scale, spacing, font_size, char, verbose)
-        current_x += x_advance
+        add_position((glyph_name, current_x))
+        current_x += get_advance(glyph_name, default_advance) * spacing
         previous_glyph_name = glyph_name
-    return current_x
+    return positions, current_x
+
+
+def _tessellate_glyph(glyph_set, glyph_name, msp, scale, curve_quality, verbose=False):
+    """Flatten a glyph's outline into a DXFPen, or return None if the glyph is missing or can't be drawn."""
+    try:
+        glyph = glyph_set[glyph_name]
+    except KeyError:
+        if verbose:
+            print(f"  Warning: Glyph '{glyph_name}' not found in font, skipping")
+        return None
+
+    pen = DXFPen(msp, scale=scale, curve_quality=curve_quality)
+    try:
+        glyph.draw(pen)
+    except Exception as e:
+        if verbose:
+            print(f"  Warning: Could not draw glyph '{glyph_name}': {e}")
+        return None
+
+    pen.endPath()
+    return pen
+
+
+def _write_r12_polylines(output_path, paths, closed_flags):
+    """Stream polylines straight to an R12 DXF file on the TEXT_OUTLINES layer."""
+    from ezdxf.addons import r12writer
 
+    with r12writer(output_path) as dxf:
+        for path, closed in zip(paths, closed_flags):
+            # Closed paths repeat their first point, which the closed polyline doesn't need
+            vertices = path[:-1] if closed else path
+            if len(vertices) > 1:
+                # R12 files written this way have no layer table, so give the entities the layer's red color
+                dxf.add_polyline_2d(vertices.tolist(), closed=closed, layer="TEXT_OUTLINES", color=1)
 
-def text_to_dxf(font_path, lines_of_text, output_path, font_size=20, spacing=1.0, curve_quality=0.5, verbose=False, kerning=True, surround='none', padding=5.0, gap=3.0, corner_radius=0.0, font_index=0, line_spacing=1.5):
+
+def text_to_dxf(font_path, lines_of_text, output_path, font_size=20, spacing=1.0, curve_quality=0.5, verbose=False, kerning=True, surround='none', padding=5.0, gap=3.0, corner_radius=0.0, font_index=0, line_spacing=1.5, use_blocks=False, stream=False):
     """
     Convert text to DXF outlines using the specified font.
+
+    With use_blocks, each distinct glyph is written once as a DXF block and placed
+    with INSERT references instead of repeating its polylines at every occurrence.
+    With stream, the outlines are written straight to an R12 DXF file without building
+    an ezdxf document; the returned model space is then None.
     """
+    if stream and (surround != 'none' or use_blocks):
+        raise ValueError("Streamed R12 output supports neither surrounding shapes nor blocks")
+
     font, scale = _load_font_and_get_scale(font_path, font_size, font_index, verbose)
-    doc, msp = _setup_dxf_document(verbose)
-    glyph_set, cmap = _get_font_tables(font, verbose)
-
-    is_symbol_font = False
-    if cmap and cmap.keys():
-        min_code = min(cmap.keys())
-        if 0xF000 <= min_code <= 0xF8FF: # PUA range
-            is_symbol_font = True
-            if verbose:
-                print("Detected a Symbol font based on character codes in the PUA range.")
+    doc, msp = (None, None) if stream else _setup_dxf_document(verbose)
+    glyph_set, cmap, advance_map = _get_font_tables(font, scale, verbose)
+    kerning_table = _get_kerning_table(font_path, font_index, verbose) if kerning else {}
+
+    # Resolve each distinct character of the text to its glyph name once, in order of
+    # first occurrence; characters missing from the font are reported here and left out
+    char_to_glyph = {}
+    for char in dict.fromkeys(''.join(lines_of_text)):
+        if char == ' ':
+            continue
+        glyph_name = cmap.get(ord(char))
+        if glyph_name is not None:
+            char_to_glyph[char] = glyph_name
+        elif verbose:
+            print(f"  Warning: Character '{char}' (code: {ord(char)}) not found in font, skipping")
 
-    space_advance = font_size * 0.4 # Default fallback
-    try:
-        # Get advance width for space character from hmtx table
-        space_glyph_name = cmap.get(ord(' '))
-        if space_glyph_name and 'hmtx' in font:
-            space_advance, _ = font['hmtx'][space_glyph_name]
-            space_advance *= scale
-    except Exception:
-        pass # Keep fallback value
+    # Advance width of the space character, with a generic fallback
+    space_advance = advance_map.get(cmap.get(ord(' ')), font_size * 0.4)
 
     if verbose:
         print(f"Space advance width: {space_advance}")
-    # First Pass: Calculate widths of all lines
-    line_widths = []
-    for line_text in lines_of_text:
-        line_width = _calculate_line_width(font, line_text, glyph_set, cmap, scale, spacing, font_size, kerning, is_symbol_font, verbose)
-        line_widths.append(line_width)
-    
-    max_line_width = max(line_widths) if line_widths else 0
+    # Lay out every line first: centering needs each line's width
+    line_layouts = [
+        _layout_line(line_text, glyph_set, char_to_glyph, advance_map, kerning_table, scale, spacing, font_size, space_advance, kerning, verbose)
+        for line_text in lines_of_text
+    ]
 
     # Calculate total text height and initial y_offset for vertical centering
     line_height = font_size * line_spacing
@@ -785,82 +1099,78 @@ def text_to_dxf(font_path, lines_of_text, output_path, font_size=20, spacing=1.0
     current_y_offset = -total_text_height / 2 + font_size / 2 # Start from the baseline of the top line
 
     all_paths = []
-    surrounding_paths = []
+    all_closed = []  # Whether each path in all_paths is closed, with stream
+    glyph_boxes = []  # (min_x, min_y, max_x, max_y) of every placed glyph, needed for the surround
     successful_chars = 0
+    glyph_cache = {}  # glyph_name -> DXFPen holding the glyph's flattened outline, or None if it can't be drawn
+    glyph_blocks = {}  # glyph_name -> name of the DXF block holding the glyph, with use_blocks
+    # Bind lookups used for every placed glyph to locals
+    add_paths = all_paths.extend
+    add_closed = all_closed.extend
+    add_glyph_box = glyph_boxes.append
+    get_cached_pen = glyph_cache.get
+    need_boxes = surround != 'none'
     
-    # Second Pass: Draw each line
-    for line_idx, line_text in enumerate(lines_of_text):
-        line_width = line_widths[line_idx]
-        
+    # Tick the progress bar every 100 glyphs rather than for every glyph, so long lines still show progress
+    progress = None
+    progress_step = 100
+    if verbose:
+        # Imported here so non-verbose runs don't pay tqdm's import time
+        from tqdm import tqdm
+
+        progress = tqdm(total=sum(len(positions) for positions, _ in line_layouts), desc="Processing glyphs", unit="glyph", leave=False)
+    for positions, line_width in line_layouts:
         # Calculate x_offset to center the current line
         x_offset = -line_width / 2 # Center each line horizontally
-        
-        previous_glyph_name = None  # Reset for kerning for each new line
-
-        for char in tqdm(line_text, desc=f"Processing line {line_idx + 1}/{len(lines_of_text)}", leave=False, disable=not verbose):
-            if char == ' ':
-                x_offset += space_advance
-                previous_glyph_name = None
-                continue
-
-            char_code = ord(char)
-            if is_symbol_font:
-                if char_code <= 255:
-                    char_code += 0xF000
-
-            if char_code not in cmap:
-                if verbose:
-                    print(f"  Warning: Character '{char}' (code: {char_code}) not found in font, skipping")
-                previous_glyph_name = None
-                continue
 
-            glyph_name = cmap[char_code]
-
-            if kerning and previous_glyph_name:
-                adjustment = _get_kerning_adjustment(font, previous_glyph_name, glyph_name, scale, verbose)
-                x_offset += adjustment
-
-            try:
-                glyph = glyph_set[glyph_name]
-            except KeyError:
-                if verbose:
-                    print(f"  Warning: Glyph '{glyph_name}' not found in font, skipping")
-                previous_glyph_name = None
-                continue
-
-            pen = DXFPen(msp, x_offset, current_y_offset, scale, curve_quality)
-            try:
-                glyph.draw(pen)
-            except Exception as e:
-                if verbose:
-                    print(f"  Warning: Could not draw glyph '{glyph_name}': {e}")
+        for glyph_count, (glyph_name, glyph_x) in enumerate(positions, 1):
+            if progress is not None and glyph_count % progress_step == 0:
+                progress.update(progress_step)
+
+            # Flatten each distinct glyph once and reuse its outline for repeated characters
+            pen = get_cached_pen(glyph_name, False)
+            if pen is False:
+                pen = glyph_cache[glyph_name] = _tessellate_glyph(glyph_set, glyph_name, msp, scale, curve_quality, verbose)
+                if pen is not None and use_blocks:
+                    # Define the glyph once as a block with its origin at the glyph origin; block names
+                    # are case-insensitive, so they use the glyph ID rather than the glyph name
+                    block_name = glyph_blocks[glyph_name] = f"GLYPH_{font.getGlyphID(glyph_name)}"
+                    pen.draw_to_dxf(0, 0, layout=doc.blocks.new(name=block_name))
+            if pen is None:
                 continue
 
-            pen.endPath()
-            pen.draw_to_dxf()
-            all_paths.extend(pen.paths)
+            glyph_x += x_offset
+            if use_blocks:
+                msp.add_blockref(glyph_blocks[glyph_name], (glyph_x, current_y_offset), dxfattribs=DXFPen.POLYLINE_ATTRIBS)
+                add_paths(pen.place(glyph_x, current_y_offset))
+            elif stream:
+                add_paths(pen.place(glyph_x, current_y_offset))
+                add_closed(pen.closed)
+            else:
+                add_paths(pen.draw_to_dxf(glyph_x, current_y_offset))
             successful_chars += 1
 
-            x_advance = _get_char_advance(font, glyph_name, glyph_set, scale, spacing, font_size, char, verbose)
-            x_offset += x_advance
-            
-            previous_glyph_name = glyph_name
+            # Place the glyph's cached font-unit bounds instead of scanning every placed point
+            glyph_bounds = pen.get_bounds() if need_boxes else None
+            if glyph_bounds:
+                min_gx, min_gy, max_gx, max_gy = glyph_bounds
+                add_glyph_box((min_gx * scale + glyph_x, min_gy * scale + current_y_offset,
+                               max_gx * scale + glyph_x, max_gy * scale + current_y_offset))
         
+        if progress is not None:
+            # Count the glyphs after the line's last full step
+            progress.update(len(positions) % progress_step)
         current_y_offset -= line_height # Move down for the next line
 
+    if progress is not None:
+        progress.close()
     if verbose:
         print(f"Processed {successful_chars} characters successfully")
 
     # After generating all text paths, calculate the bounding box
-    if all_paths and surround != 'none':
-        min_x, min_y = float('inf'), float('inf')
-        max_x, max_y = float('-inf'), float('-inf')
-        for path in all_paths:
-            for x, y in path:
-                min_x = min(min_x, x)
-                min_y = min(min_y, y)
-                max_x = max(max_x, x)
-                max_y = max(max_y, y)
+    if glyph_boxes and surround != 'none':
+        min_xs, min_ys, max_xs, max_ys = zip(*glyph_boxes)
+        min_x, min_y, max_x, max_y = min(min_xs), min(min_ys), max(max_xs), max(max_ys)
 
         if verbose:
             print(f"Text bounding box: ({min_x:.2f}, {min_y:.2f}) to ({max_x:.2f}, {max_y:.2f})")
@@ -869,7 +1179,10 @@ def text_to_dxf(font_path, lines_of_text, output_path, font_size=20, spacing=1.0
         generate_surrounding_shape(msp, min_x, min_y, max_x, max_y, surround, padding, gap, corner_radius, verbose)
 
     try:
-        if output_path:
+        if output_path and stream:
+            _write_r12_polylines(output_path, all_paths, all_closed)
+            print(f"DXF file saved successfully: {output_path}")
+        elif output_path:
             # Add a new layer for the surrounding shape
             if surround != 'none':
                 doc.layers.add("SURROUND", color=2)  # Yellow color
@@ -878,12 +1191,16 @@ def text_to_dxf(font_path, lines_of_text, output_path, font_size=20, spacing=1.0
             print(f"DXF file saved successfully: {output_path}")
         if verbose:
             print("Summary:")
-            print(f"  Text: '{' '.join(lines_of_text)}'")
+            # Don't echo giant inputs back in full
+            if any(len(line) > 200 for line in lines_of_text):
+                print(f"  Text: {len(lines_of_text)} line(s), too long to show")
+            else:
+                print(f"  Text: '{' '.join(lines_of_text)}'")
             print(f"  Font: {font_path}")
             print(f"  Font size: {font_size}mm")
             print(f"  Character spacing: {spacing}")
             print(f"  Kerning enabled: {kerning}")
-            print(f"  Characters processed: {successful_chars}/{len([c for line in lines_of_text for c in line if c != ' '])}")
+            print(f"  Characters processed: {successful_chars}/{sum(len(line) - line.count(' ') for line in lines_of_text)}")
     except Exception as e:
         raise RuntimeError(f"Could not save DXF file '{output_path}': {e}")
     finally:
@@ -900,11 +1217,16 @@ def preview_paths(text_paths, msp=None, preview=False, preview_file=None, verbos
     if not preview and not preview_file:
         return
 
+    # Imported here so runs without a preview don't pay matplotlib's import time
+    import matplotlib.pyplot as plt
+    from matplotlib.collections import LineCollection
+
     plt.figure()
-    for path in text_paths:
-        if len(path) > 1:
-            x, y = zip(*path)
-            plt.plot(x, y, color='black', linewidth=1.5, label='Text Outlines')
+    ax = plt.gca()
+    # Draw all outlines of a kind as one collection rather than one plot call per path;
+    # closed glyph outlines already end on their first point
+    text_segments = [path for path in text_paths if len(path) > 1]
+    ax.add_collection(LineCollection(text_segments, colors='black', linewidths=1.5, label='Text Outlines'))
 
     if msp:
         surrounding_paths_for_preview = []
@@ -934,26 +1256,25 @@ def preview_paths(text_paths, msp=None, preview=False, preview_file=None, verbos
                     rotation = major_axis_vec.angle # Angle of major axis with x-axis
 
                     num_segments = 100
-                    ellipse_points = []
-                    for i in range(num_segments + 1):
-                        angle_param = start_param + (end_param - start_param) * i / num_segments
-                        
-                        # Point on unrotated ellipse
-                        x_unrotated = major_radius * math.cos(angle_param)
-                        y_unrotated = minor_radius * math.sin(angle_param)
-                        
-                        # Rotate and translate
-                        x = center.x + x_unrotated * math.cos(rotation) - y_unrotated * math.sin(rotation)
-                        y = center.y + x_unrotated * math.sin(rotation) + y_unrotated * math.cos(rotation)
-                        
-                        ellipse_points.append((x, y))
+                    angle_params = np.linspace(start_param, end_param, num_segments + 1)
+
+                    # Points on the unrotated ellipse
+                    x_unrotated = major_radius * np.cos(angle_params)
+                    y_unrotated = minor_radius * np.sin(angle_params)
+
+                    # Rotate and translate
+                    cos_rotation, sin_rotation = math.cos(rotation), math.sin(rotation)
+                    ellipse_points = np.column_stack((
+                        center.x + x_unrotated * cos_rotation - y_unrotated * sin_rotation,
+                        center.y + x_unrotated * sin_rotation + y_unrotated * cos_rotation,
+                    ))
                     surrounding_paths_for_preview.append(ellipse_points)
         
-        for path in surrounding_paths_for_preview:
-            if len(path) > 1:
-                x, y = zip(*path)
-                plt.plot(x, y, color='blue', linestyle='--', linewidth=1.0, label='Surrounding Shape')
+        surrounding_paths_for_preview = [path for path in surrounding_paths_for_preview if len(path) > 1]
+        ax.add_collection(LineCollection(surrounding_paths_for_preview, colors='blue', linestyles='--', linewidths=1.0,
+                                         label='Surrounding Shape'))
     
+    ax.autoscale_view()
     plt.axis('equal')
     plt.title('text_to_dxf preview')
     plt.xlabel('X')
@@ -970,6 +1291,13 @@ def preview_paths(text_paths, msp=None, preview=False, preview_file=None, verbos
 
 def main():
     """Main function to handle command line arguments."""
+    # Plain --list-fonts needs no other options, so skip building the parser
+    if sys.argv[1:] == ['--list-fonts']:
+        list_fonts()
+        return
+
+    import argparse
+
     parser = argparse.ArgumentParser(description='Convert text to DXF font outlines')
     
     parser.add_argument('--list-fonts', action='store_true',
@@ -989,7 +1317,7 @@ def main():
                        help='Font size in mm (default: 20)')
     parser.add_argument('--spacing', type=float, default=1.0,
                        help='Character spacing multiplier (default: 1.0)')
-    parser.add_argument('--quality', choices=['low', 'medium', 'high'], default='high',
+    parser.add_argument('--quality', choices=list(_QUALITY_MAP), default='high',
                        help='Curve quality: low, medium, or high (default: high)')
     parser.add_argument('--kerning', action=argparse.BooleanOptionalAction, default=True,
                         help='Enable/disable font kerning (default: --kerning)')
@@ -999,6 +1327,10 @@ def main():
                           help='Preview the generated paths using matplotlib')
     parser.add_argument('--preview-file', type=str,
                           help='Save the matplotlib preview to a file')
+    parser.add_argument('--blocks', action='store_true',
+                       help='Write each distinct glyph once as a DXF block and place it with INSERT references')
+    parser.add_argument('--stream', action='store_true',
+                       help='Stream the outlines straight to an R12 DXF file (fastest; no --surround or --blocks)')
 
     # Arguments for surrounding shape
     parser.add_argument('--surround', type=str, choices=['none', 'rectangle', 'double_rectangle', 'oval', 'double_oval'], default='none',
@@ -1024,6 +1356,8 @@ def main():
     # Validate required arguments for text conversion
     if not args.text and not args.list_fonts and not args.list_common_fonts:
         parser.error('text argument is required (unless using --list-fonts or --list-common-fonts)')
+    if args.stream and (args.surround != 'none' or args.blocks):
+        parser.error('--stream cannot be combined with --surround or --blocks')
     
 
     
@@ -1038,7 +1372,7 @@ def main():
             print(f"Using font file: {font_path}")
     else:
         # Treat it as a font name and search system fonts
-        font_path = find_font_by_name(args.font)
+        font_path = resolve_font_cached(args.font)
         if not font_path:
             print(f"Could not find font '{args.font}'. Use --list-fonts to see available fonts.")
             sys.exit(1)
@@ -1046,22 +1380,22 @@ def main():
             print(f"Using system font: {args.font}")
             print(f"Font path: {font_path}")
     
-    quality_map = {
-        'low': 0.1,
-        'medium': 0.5,
-        'high': 1.0
-    }
-    curve_quality = quality_map[args.quality]
+    curve_quality = _QUALITY_MAP[args.quality]
     
     try:
-        all_paths, msp = text_to_dxf(font_path, args.text, args.output, args.size, args.spacing, curve_quality, args.verbose, args.kerning, args.surround, args.padding, args.gap, args.corner_radius, args.font_index, args.line_spacing)
+        all_paths, msp = text_to_dxf(font_path, args.text, args.output, args.size, args.spacing, curve_quality, args.verbose, args.kerning, args.surround, args.padding, args.gap, args.corner_radius, args.font_index, args.line_spacing, args.blocks, args.stream)
         if args.preview or args.preview_file:
+            if not args.preview:
+                # Only saving to a file: use the non-interactive Agg backend instead of a GUI backend
+                import matplotlib
+                matplotlib.use('Agg', force=True)
             preview_paths(all_paths, msp, args.preview, args.preview_file, args.verbose)
     except Exception as e:
-        import traceback
         print(f"Error: {e}")
-        print(f"Full traceback:")
-        traceback.print_exc()
+        if args.verbose:
+            import traceback
+            print(f"Full traceback:")
+            traceback.print_exc()
         sys.exit(1)
 
 